@@ -422,6 +422,11 @@ class _EnvReloader(object):
         )
         THREADING_LAYER = _readenv("NUMBA_THREADING_LAYER", str, 'default')
 
+        # parallel ufuncs/gufuncs called with less work than this (counted in
+        # elements) are run in the calling thread, 0 disables this
+        PARALLEL_UFUNC_SERIAL_THRESHOLD = _readenv(
+            "NUMBA_PARALLEL_UFUNC_SERIAL_THRESHOLD", int, 4096)
+
         CAPTURED_ERRORS = _readenv("NUMBA_CAPTURED_ERRORS",
                                    _validate_captured_errors_style,
                                    'old_style')
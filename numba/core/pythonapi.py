@@ -877,6 +877,34 @@ class PythonAPI(object):
         fn = self._get_function(fnty, "numba_gil_release")
         return self.builder.call(fn, [gil])
 
+    def gil_check(self):
+        """
+        Return a boolean (i1) indicating whether the current thread holds
+        the GIL, i.e. whether its thread state is the current one.
+        PyGILState_Check() isn't used as CPython disables it (it always
+        returns 1) once a sub-interpreter has been created.
+        """
+        fnty = ir.FunctionType(self.voidptr, [])
+        if PYVERSION >= (3, 12):
+            # the unchecked getter reads the calling thread's thread state
+            if PYVERSION >= (3, 13):
+                name = "PyThreadState_GetUnchecked"
+            else:
+                name = "_PyThreadState_UncheckedGet"
+            fn = self._get_function(fnty, name=name)
+            return cgutils.is_not_null(self.builder,
+                                       self.builder.call(fn, []))
+        # Before 3.12 the unchecked getter returns the thread state of
+        # whichever thread holds the GIL, so compare it with this thread's
+        # as PyGILState_Check() does.
+        fn = self._get_function(fnty, name="_PyThreadState_UncheckedGet")
+        current = self.builder.call(fn, [])
+        fn = self._get_function(fnty, name="PyGILState_GetThisThreadState")
+        this_thread = self.builder.call(fn, [])
+        is_this_thread = self.builder.icmp_unsigned('==', current, this_thread)
+        return self.builder.and_(cgutils.is_not_null(self.builder, current),
+                                 is_this_thread)
+
     def save_thread(self):
         """
         Release the GIL and return the former thread state
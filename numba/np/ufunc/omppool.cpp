@@ -153,10 +153,19 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
         printf("\n");
     }
 
+    // The next unclaimed index in the outer dimension, shared by the team,
+    // and the lock guarding it. The lock is local to this call (rather than
+    // a named critical section, which is one lock for the whole process) so
+    // that nested teams and concurrent calls don't contend on it.
+    ptrdiff_t next = 0;
+    omp_lock_t next_lock;
+    omp_init_lock(&next_lock);
+
     // Set the thread mask on the pragma such that the state is scope limited
     // and passed via a register on the OMP region call site, this limiting
     // global state and racing
-    #pragma omp parallel num_threads(num_threads), shared(agreed_nthreads)
+    #pragma omp parallel num_threads(num_threads), \
+        shared(agreed_nthreads, next, next_lock)
     {
         size_t * count_space = (size_t *)alloca(sizeof(size_t) * arg_len);
         char ** array_arg_space = (char**)alloca(sizeof(char*) * array_count);
@@ -164,11 +173,26 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
         // tell the active thread team about the number of threads
         set_num_threads(agreed_nthreads);
 
-        #pragma omp for
-        for(ptrdiff_t r = 0; r < size; r++)
+        const ptrdiff_t team_size = omp_get_num_threads();
+
+        // Guided self-scheduling: threads repeatedly claim a contiguous block
+        // of 1/team_size of the remaining outer dimension and call the kernel
+        // once for that block. Blocks shrink as the work drains, so threads
+        // that finish early pick up the tail when the cost per element is
+        // uneven, whilst the number of kernel calls stays O(P log(N/P)).
+        while (true)
         {
+            ptrdiff_t begin, count;
+            omp_set_lock(&next_lock);
+            begin = next;
+            count = (size - begin + team_size - 1) / team_size;
+            next = begin + count;
+            omp_unset_lock(&next_lock);
+            if (count <= 0)
+                break;
+
             memcpy(count_space, dimensions, arg_len * sizeof(size_t));
-            count_space[0] = 1;
+            count_space[0] = count;
 
             if(_DEBUG)
             {
@@ -182,7 +206,7 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
             {
                 char * base = args[j];
                 size_t step = steps[j];
-                ptrdiff_t offset = step * r;
+                ptrdiff_t offset = step * begin;
                 array_arg_space[j] = base + offset;
 
                 if(0&&_DEBUG)
@@ -205,6 +229,8 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
             func(array_arg_space, count_space, steps, data);
         }
     }
+
+    omp_destroy_lock(&next_lock);
 }
 
 static void launch_threads(int count)
@@ -10,9 +10,11 @@ UFuncCore also defines a work-stealing mechanism that allows idle threads
 to steal works from other threads.
 """
 
+import functools
 import os
 import sys
 import warnings
+import importlib.util
 from threading import RLock as threadRLock
 from ctypes import CFUNCTYPE, c_int, CDLL, POINTER, c_uint
 
@@ -46,7 +48,20 @@ def get_thread_count():
 NUM_THREADS = get_thread_count()
 
 
-def build_gufunc_kernel(library, ctx, info, sig, inner_ndim):
+def _declare_get_num_threads(module):
+    """
+    Declare the threading layer's ``get_num_threads`` in *module*.
+
+    All the threading layers implement this as a read of a thread local slot
+    (the only write being an idempotent lazy initialisation of state private
+    to the threading layer), so it is declared as a pure function. This lets
+    LLVM reuse the result until something that may change it is called.
+    """
+    fnty = ir.FunctionType(ir.IntType(types.intp.bitwidth), [])
+    return cgutils.insert_pure_function(module, fnty, "get_num_threads")
+
+
+def build_gufunc_kernel(library, ctx, info, sig, inner_ndim, work_ndim=0):
     """Wrap the original CPU ufunc/gufunc with a parallel dispatcher.
     This function will wrap gufuncs and ufuncs something like.
 
@@ -65,6 +80,13 @@ def build_gufunc_kernel(library, ctx, info, sig, inner_ndim):
         inner dimension of the gufunc (this is len(sig.args) in the case of a
         ufunc)
 
+    work_ndim
+        the number of leading entries of `dimensions` whose product estimates
+        the amount of work in a call. Calls with less work than
+        config.PARALLEL_UFUNC_SERIAL_THRESHOLD run the inner function directly
+        in the calling thread. 0 (the default) always uses the threading
+        layer.
+
     Returns
     -------
     wrapper_info : (library, env, name)
@@ -95,6 +117,58 @@ def build_gufunc_kernel(library, ctx, info, sig, inner_ndim):
     choose to ignore it (TBB)!
     """
     assert isinstance(info, tuple)  # guard against old usage
+
+    # Array count depends on whether an "output" array is needed. In the case
+    # of a void return type cf. gufunc it is the number of args, in the case of
+    # a non-void return type cf. ufunc it is the number of args + 1 so as to
+    # account for the output array.
+    array_count = len(sig.args)
+    if not isinstance(sig.return_type, types.NoneType):
+        array_count += 1
+
+    wrapperlib = ctx.codegen().create_library('parallelgufuncwrapper')
+    mod = wrapperlib.create_ir_module('parallel.gufunc.wrapper')
+
+    # The wrapper IR doesn't depend on the inner function beyond its name, so
+    # it is generated once per layout and the names are patched in.
+    key = (inner_ndim, array_count, work_ndim,
+           config.PARALLEL_UFUNC_SERIAL_THRESHOLD, mod.triple, mod.data_layout)
+    try:
+        template = _wrapper_ir_cache[key]
+    except KeyError:
+        _emit_gufunc_kernel(ctx, mod, inner_ndim, array_count, work_ndim)
+        template = cgutils.normalize_ir_text(str(mod))
+        _wrapper_ir_cache[key] = template
+
+    kernel_name = ".kernel.{}_{}".format(id(info.env), info.name)
+    ll_module = ll.parse_assembly(template)
+    ll_module.name = mod.name
+    ll_module.get_function(_KERNEL_TEMPLATE_NAME).name = kernel_name
+    ll_module.get_function(_INNER_TEMPLATE_NAME).name = info.name
+    ll_module.verify()
+
+    wrapperlib.add_llvm_module(ll_module)
+    wrapperlib.add_linking_library(info.library)
+    wrapperlib.add_linking_library(library)
+    return _wrapper_info(library=wrapperlib, name=kernel_name, env=info.env)
+
+
+# Placeholder names of the kernel and of the inner function it calls in the
+# cached wrapper IR
+_KERNEL_TEMPLATE_NAME = '.kernel.template'
+_INNER_TEMPLATE_NAME = '.kernel.template.inner'
+
+# (inner_ndim, array_count, work_ndim, serial threshold, triple, data layout)
+# -> textual LLVM IR of the kernel wrapper
+_wrapper_ir_cache = {}
+
+
+def _emit_gufunc_kernel(ctx, mod, inner_ndim, array_count, work_ndim):
+    """
+    Emit the body of the parallel kernel described in build_gufunc_kernel
+    into *mod*, using the placeholder names for the kernel and the inner
+    function.
+    """
     # Declare types and function
     byte_t = ir.IntType(8)
     byte_ptr_t = ir.PointerType(byte_t)
@@ -107,10 +181,7 @@ def build_gufunc_kernel(library, ctx, info, sig, inner_ndim):
                                            ir.PointerType(intp_t),
                                            ir.PointerType(intp_t),
                                            byte_ptr_t])
-    wrapperlib = ctx.codegen().create_library('parallelgufuncwrapper')
-    mod = wrapperlib.create_ir_module('parallel.gufunc.wrapper')
-    kernel_name = ".kernel.{}_{}".format(id(info.env), info.name)
-    lfunc = ir.Function(mod, fnty, name=kernel_name)
+    lfunc = ir.Function(mod, fnty, name=_KERNEL_TEMPLATE_NAME)
 
     bb_entry = lfunc.append_basic_block('')
 
@@ -119,24 +190,9 @@ def build_gufunc_kernel(library, ctx, info, sig, inner_ndim):
 
     args, dimensions, steps, data = lfunc.args
 
-    # Release the GIL (and ensure we have the GIL)
-    # Note: numpy ufunc may not always release the GIL; thus,
-    #       we need to ensure we have the GIL.
-    pyapi = ctx.get_python_api(builder)
-    gil_state = pyapi.gil_ensure()
-    thread_state = pyapi.save_thread()
-
     def as_void_ptr(arg):
         return builder.bitcast(arg, byte_ptr_t)
 
-    # Array count depends on whether an "output" array is needed. In the case
-    # of a void return type cf. gufunc it is the number of args, in the case of
-    # a non-void return type cf. ufunc it is the number of args + 1 so as to
-    # account for the output array.
-    array_count = len(sig.args)
-    if not isinstance(sig.return_type, types.NoneType):
-        array_count += 1
-
     parallel_for_ty = ir.FunctionType(ir.VoidType(),
                                       [byte_ptr_t] * 5 + [intp_t, ] * 3)
     parallel_for = cgutils.get_or_insert_function(mod, parallel_for_ty,
@@ -148,36 +204,73 @@ def build_gufunc_kernel(library, ctx, info, sig, inner_ndim):
         [byte_ptr_ptr_t, intp_ptr_t, intp_ptr_t, byte_ptr_t],
     )
     tmp_voidptr = cgutils.get_or_insert_function(mod, innerfunc_fnty,
-                                                 info.name,)
-    wrapperlib.add_linking_library(info.library)
-
-    get_num_threads = cgutils.get_or_insert_function(
-        builder.module,
-        ir.FunctionType(ir.IntType(types.intp.bitwidth), []),
-        "get_num_threads")
-
+                                                 _INNER_TEMPLATE_NAME)
+
+    # For small amounts of work the cost of waking up the threading layer
+    # (and of the GIL handling) dominates, just run the inner function in the
+    # calling thread.
+    serial_threshold = config.PARALLEL_UFUNC_SERIAL_THRESHOLD
+    if work_ndim > 0 and serial_threshold > 0:
+        work = builder.load(dimensions)
+        for i in range(1, work_ndim):
+            dim = builder.load(builder.gep(dimensions, [intp_t(i)]))
+            work = builder.mul(work, dim)
+        is_small = builder.icmp_signed('<', work, intp_t(serial_threshold))
+        with builder.if_then(is_small):
+            builder.call(tmp_voidptr, [args, dimensions, steps, data])
+            builder.ret_void()
+
+    get_num_threads = _declare_get_num_threads(builder.module)
     num_threads = builder.call(get_num_threads, [])
 
     # Prepare call
     fnptr = builder.bitcast(tmp_voidptr, byte_ptr_t)
     innerargs = [as_void_ptr(x) for x
                  in [args, dimensions, steps, data]]
-    builder.call(parallel_for, [fnptr] + innerargs +
-                 [intp_t(x) for x in (inner_ndim, array_count)] + [num_threads])
 
-    # Release the GIL
-    pyapi.restore_thread(thread_state)
-    pyapi.gil_release(gil_state)
+    def call_parallel_for():
+        builder.call(parallel_for, [fnptr] + innerargs +
+                     [intp_t(x) for x in (inner_ndim, array_count)] +
+                     [num_threads])
+
+    # The GIL must not be held whilst the work is running so that worker
+    # threads can acquire it (e.g. for object mode blocks). The kernel can be
+    # reached with or without the GIL held: numpy may or may not release it
+    # around the ufunc loop and nopython callers may be running with
+    # nogil=True. Release it around the work only if this thread holds it,
+    # there's no need to ensure it is held first. Whether it is held must
+    # come from the thread state (gil_check) and not PyGILState_Check, which
+    # CPython disables once a sub-interpreter has been created.
+    pyapi = ctx.get_python_api(builder)
+    with builder.if_else(pyapi.gil_check()) as (has_gil, no_gil):
+        with has_gil:
+            thread_state = pyapi.save_thread()
+            call_parallel_for()
+            pyapi.restore_thread(thread_state)
+        with no_gil:
+            call_parallel_for()
 
     builder.ret_void()
 
-    wrapperlib.add_ir_module(mod)
-    wrapperlib.add_linking_library(library)
-    return _wrapper_info(library=wrapperlib, name=lfunc.name, env=info.env)
-
 
 # ------------------------------------------------------------------------------
 
+# Numba type -> NumPy dtype number, saves creating a dtype per argument on
+# every build
+_dtype_num_cache = {}
+
+
+def _dtype_num(ty):
+    """
+    Get the NumPy dtype number for the Numba type *ty*.
+    """
+    try:
+        return _dtype_num_cache[ty]
+    except KeyError:
+        num = _dtype_num_cache[ty] = as_dtype(ty).num
+        return num
+
+
 class ParallelUFuncBuilder(ufuncbuilder.UFuncBuilder):
     def build(self, cres, sig):
         _launch_threads()
@@ -191,8 +284,8 @@ class ParallelUFuncBuilder(ufuncbuilder.UFuncBuilder):
         info = build_ufunc_wrapper(library, ctx, fname, signature, cres)
         ptr = info.library.get_pointer_to_function(info.name)
         # Get dtypes
-        dtypenums = [np.dtype(a.name).num for a in signature.args]
-        dtypenums.append(np.dtype(signature.return_type.name).num)
+        dtypenums = [_dtype_num(a) for a in signature.args]
+        dtypenums.append(_dtype_num(signature.return_type))
         keepalive = ()
         return dtypenums, ptr, keepalive
 
@@ -201,8 +294,9 @@ def build_ufunc_wrapper(library, ctx, fname, signature, cres):
     innerfunc = ufuncbuilder.build_ufunc_wrapper(library, ctx, fname,
                                                  signature, objmode=False,
                                                  cres=cres)
+    # only dimensions[0] is valid for a ufunc loop
     info = build_gufunc_kernel(library, ctx, innerfunc, signature,
-                               len(signature.args))
+                               len(signature.args), work_ndim=1)
     return info
 
 # ---------------------------------------------------------------------------
@@ -244,7 +338,7 @@ class ParallelGUFuncBuilder(ufuncbuilder.GUFuncBuilder):
                 ty = a.dtype
             else:
                 ty = a
-            dtypenums.append(as_dtype(ty).num)
+            dtypenums.append(_dtype_num(ty))
 
         return dtypenums, ptr, env
 
@@ -268,8 +362,11 @@ def build_gufunc_wrapper(py_func, cres, sin, sout, cache, is_parfors):
     sym_out = set(sym for term in sout for sym in term)
     inner_ndim = len(sym_in | sym_out)
 
+    # The work of a parfors kernel is in its schedule, it is not known from the
+    # dimensions so always hand it to the threading layer.
+    work_ndim = 0 if is_parfors else inner_ndim + 1
     info = build_gufunc_kernel(
-        library, ctx, innerinfo, signature, inner_ndim,
+        library, ctx, innerinfo, signature, inner_ndim, work_ndim=work_ndim,
     )
     return info
 
@@ -342,9 +439,12 @@ def threading_layer():
         return _threading_layer
 
 
-def _check_tbb_version_compatible():
+@functools.lru_cache(maxsize=1)
+def _tbb_version_problem():
     """
-    Checks that if TBB is present it is of a compatible version.
+    Returns None if TBB is present and of a compatible version, else a string
+    describing the problem. The result is cached as working it out requires
+    loading the TBB library.
     """
     try:
         # first check that the TBB version is new enough
@@ -369,20 +469,35 @@ def _check_tbb_version_compatible():
                    "threading layer is disabled.") % tbb_iface_ver
             problem = errors.NumbaWarning(msg)
             warnings.warn(problem)
-            raise ImportError("Problem with TBB. Reason: %s" % msg)
+            return msg
     except (ValueError, OSError) as e:
-        # Translate as an ImportError for consistent error class use, this error
-        # will never materialise
-        raise ImportError("Problem with TBB. Reason: %s" % e)
+        return str(e)
+    return None
+
+
+def _check_tbb_version_compatible():
+    """
+    Checks that if TBB is present it is of a compatible version.
+    """
+    problem = _tbb_version_problem()
+    if problem is not None:
+        # Translate as an ImportError for consistent error class use
+        raise ImportError("Problem with TBB. Reason: %s" % problem)
 
 
 def _launch_threads():
+    global _is_initialized
+    # Fast path, _is_initialized is only ever set (False -> True) whilst
+    # holding both locks, so if it is seen as set here there's nothing to do.
+    # If it is not seen as set, the check is repeated under the locks below.
+    if _is_initialized:
+        return
+
     if not _backend_init_process_lock:
         _set_init_process_lock()
 
     with _backend_init_process_lock:
         with _backend_init_thread_lock:
-            global _is_initialized
             if _is_initialized:
                 return
 
@@ -393,6 +508,11 @@ def _launch_threads():
                 lib = None
                 if backend.startswith("tbb"):
                     try:
+                        # don't go probing for the TBB library if the backend
+                        # was not built
+                        tbbpool_name = "numba.np.ufunc.tbbpool"
+                        if importlib.util.find_spec(tbbpool_name) is None:
+                            raise ImportError("tbbpool is not available")
                         # check if TBB is present and compatible
                         _check_tbb_version_compatible()
                         # now try and load the backend
@@ -578,7 +698,28 @@ snt_check = gen_snt_check()
 
 @overload(snt_check)
 def ol_snt_check(n):
-    return snt_check
+    def impl(n):
+        _isnt_check(n)
+    return impl
+
+
+@intrinsic
+def _isnt_check(typingctx, n):
+    def codegen(context, builder, signature, args):
+        [n] = args
+        [nty] = signature.args
+        max_threads = config.NUMBA_NUM_THREADS
+        # 1 <= n <= max_threads as a single unsigned compare, n - 1 wraps
+        # around for n < 1
+        n = context.cast(builder, n, nty, types.intp)
+        out_of_range = builder.icmp_unsigned('>', builder.sub(n, n.type(1)),
+                                             n.type(max_threads - 1))
+        with builder.if_then(out_of_range, likely=False):
+            msg = ("The number of threads must be between 1 and %s" %
+                   max_threads)
+            context.call_conv.return_user_exc(builder, ValueError, (msg,))
+        return context.get_dummy_value()
+    return signature(types.none, n), codegen
 
 
 def set_num_threads(n):
@@ -620,10 +761,24 @@ def ol_set_num_threads(n):
 
     def impl(n):
         snt_check(n)
-        _set_num_threads(n)
+        _iset_num_threads(n)
     return impl
 
 
+@intrinsic
+def _iset_num_threads(typingctx, n):
+    def codegen(context, builder, signature, args):
+        [n] = args
+        [nty] = signature.args
+        mod = builder.module
+        fnty = ir.FunctionType(ir.VoidType(),
+                               [context.get_value_type(types.intc)])
+        fn = cgutils.get_or_insert_function(mod, fnty, "set_num_threads")
+        builder.call(fn, [context.cast(builder, n, nty, types.intc)])
+        return context.get_dummy_value()
+    return signature(types.none, n), codegen
+
+
 def get_num_threads():
     """
     Get the number of threads used for parallel execution.
@@ -661,10 +816,8 @@ def ol_get_num_threads():
     _launch_threads()
 
     def impl():
-        num_threads = _get_num_threads()
+        num_threads = _iget_num_threads()
         if num_threads <= 0:
-            print("Broken thread_id: ", get_thread_id())
-            print("num_threads: ", num_threads)
             raise RuntimeError("Invalid number of threads. "
                                "This likely indicates a bug in Numba.")
         return num_threads
@@ -676,9 +829,7 @@ def _iget_num_threads(typingctx):
     _launch_threads()
 
     def codegen(context, builder, signature, args):
-        mod = builder.module
-        fnty = ir.FunctionType(cgutils.intp_t, [])
-        fn = cgutils.get_or_insert_function(mod, fnty, "get_num_threads")
+        fn = _declare_get_num_threads(builder.module)
         return builder.call(fn, [])
     return signature(types.intp), codegen
 
@@ -748,7 +899,7 @@ def ol_set_parallel_chunksize(n):
     def impl(n):
         if n < 0:
             raise ValueError("chunksize must be greater than or equal to zero")
-        return _set_parallel_chunksize(n)
+        return _iset_parallel_chunksize(n)
     return impl
 
 
@@ -757,5 +908,29 @@ def ol_get_parallel_chunksize():
     _launch_threads()
 
     def impl():
-        return _get_parallel_chunksize()
+        return _iget_parallel_chunksize()
     return impl
+
+
+@intrinsic
+def _iset_parallel_chunksize(typingctx, n):
+    def codegen(context, builder, signature, args):
+        [n] = args
+        [nty] = signature.args
+        mod = builder.module
+        fnty = ir.FunctionType(cgutils.intp_t, [cgutils.intp_t])
+        fn = cgutils.get_or_insert_function(mod, fnty,
+                                            "set_parallel_chunksize")
+        return builder.call(fn, [context.cast(builder, n, nty, types.uintp)])
+    return signature(types.uintp, n), codegen
+
+
+@intrinsic
+def _iget_parallel_chunksize(typingctx):
+    def codegen(context, builder, signature, args):
+        mod = builder.module
+        fnty = ir.FunctionType(cgutils.intp_t, [])
+        # reads a thread local, so pure, see _declare_get_num_threads
+        fn = cgutils.insert_pure_function(mod, fnty, "get_parallel_chunksize")
+        return builder.call(fn, [])
+    return signature(types.uintp), codegen
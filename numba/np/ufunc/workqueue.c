@@ -278,8 +278,23 @@ typedef struct
     Task task;
 } Queue;
 
+/* Each worker waits on and updates the state of its own queue, so queues are
+ * padded out to, and allocated on, cache line boundaries such that workers do
+ * not falsely share cache lines with their neighbours.
+ */
+#define CACHE_LINE_SIZE 64
+
+typedef union
+{
+    Queue queue;
+    char pad[((sizeof(Queue) + CACHE_LINE_SIZE - 1) / CACHE_LINE_SIZE)
+             * CACHE_LINE_SIZE];
+} PaddedQueue;
+
 
-static Queue *queues = NULL;
+static PaddedQueue *queues = NULL;
+/* The allocation backing `queues`, which is `queues` before alignment */
+static void *queues_alloc = NULL;
 static int queue_count;
 static int queue_pivot = 0;
 static int NUM_THREADS = -1;
@@ -397,7 +412,7 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
     char ** array_arg_space = NULL;
     const size_t arg_len = (inner_ndim + 1);
     int i; // induction var for chunking, thread count unlikely to overflow int
-    size_t j, count, remain, total;
+    size_t j, count, remain, total, start;
 
     ptrdiff_t offset;
     char * base;
@@ -408,8 +423,12 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
     debug_marker();
 
     total = *((size_t *)dimensions);
+    // Spread the leftover of the division over the first `remain` threads
+    // rather than giving it all to the last one, when total is small
+    // compared to num_threads that leftover is most of the work.
     count = total / num_threads;
-    remain = total;
+    remain = total % num_threads;
+    start = 0;
 
     if(_DEBUG)
     {
@@ -456,16 +475,7 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
     {
         count_space = (size_t *)alloca(sizeof(size_t) * arg_len);
         memcpy(count_space, dimensions, arg_len * sizeof(size_t));
-        if(i == num_threads - 1)
-        {
-            // Last thread takes all leftover
-            count_space[0] = remain;
-        }
-        else
-        {
-            count_space[0] = count;
-            remain = remain - count;
-        }
+        count_space[0] = count + ((size_t)i < remain ? 1 : 0);
 
         if(_DEBUG)
         {
@@ -484,7 +494,7 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
         {
             base = args[j];
             step = steps[j];
-            offset = step * count * i;
+            offset = step * start;
             array_arg_space[j] = (char *)(base + offset);
 
             if(_DEBUG)
@@ -506,6 +516,7 @@ parallel_for(void *fn, char **args, size_t *dimensions, size_t *steps, void *dat
             }
         }
         add_task_internal(fn, (void *)array_arg_space, (void *)count_space, steps, data, i);
+        start += count_space[0];
     }
 
     ready();
@@ -526,7 +537,7 @@ add_task_internal(void *fn, void *args, void *dims, void *steps, void *data, int
         launch_threads(NUM_THREADS);
     }
 
-    Queue *queue = &queues[queue_pivot];
+    Queue *queue = &queues[queue_pivot].queue;
 
     Task *task = &queue->task;
     task->func = func;
@@ -580,19 +591,22 @@ static void launch_threads(int count)
         /* If queues are not yet allocated,
            create them, one for each thread. */
         int i;
-        size_t sz = sizeof(Queue) * count;
+        size_t sz = sizeof(PaddedQueue) * count;
 
         /* set for use in parallel_for */
         NUM_THREADS = count;
-        queues = malloc(sz);     /* this memory will leak */
+        /* this memory will leak */
+        queues_alloc = malloc(sz + CACHE_LINE_SIZE - 1);
+        queues = (PaddedQueue *)(((uintptr_t)queues_alloc + CACHE_LINE_SIZE - 1)
+                                 & ~(uintptr_t)(CACHE_LINE_SIZE - 1));
         /* Note this initializes the state to IDLE */
         memset(queues, 0, sz);
         queue_count = count;
 
         for (i = 0; i < count; ++i)
         {
-            queue_condition_init(&queues[i].cond);
-            numba_new_thread(thread_worker, &queues[i]);
+            queue_condition_init(&queues[i].queue.cond);
+            numba_new_thread(thread_worker, &queues[i].queue);
         }
 
         _INIT_NUM_THREADS = count;
@@ -609,7 +623,7 @@ static void synchronize(void)
     int i;
     for (i = 0; i < queue_count; ++i)
     {
-        queue_state_wait(&queues[i], DONE, IDLE);
+        queue_state_wait(&queues[i].queue, DONE, IDLE);
     }
 }
 
@@ -623,13 +637,14 @@ static void ready(void)
     int i;
     for (i = 0; i < queue_count; ++i)
     {
-        queue_state_wait(&queues[i], IDLE, READY);
+        queue_state_wait(&queues[i].queue, IDLE, READY);
     }
 }
 
 static void reset_after_fork(void)
 {
-    free(queues);
+    free(queues_alloc);
+    queues_alloc = NULL;
     queues = NULL;
     if (_INIT_NUM_THREADS != -1)
     {
@@ -1621,7 +1621,7 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args, expr
     builder = lowerer.builder
 
     from numba.np.ufunc.parallel import (build_gufunc_wrapper,
-                           _launch_threads)
+                           _launch_threads, _declare_get_num_threads)
 
     if config.DEBUG_ARRAY_OPT:
         print("make_parallel_loop")
@@ -1727,20 +1727,17 @@ def call_parallel_gufunc(lowerer, cres, gu_signature, outer_sig, expr_args, expr
                                         [context.get_constant(types.uintp, i)]))
 
     # Prepare to call get/set parallel_chunksize and get the number of threads.
-    get_chunksize = cgutils.get_or_insert_function(
+    get_chunksize = cgutils.insert_pure_function(
         builder.module,
         llvmlite.ir.FunctionType(uintp_t, []),
         name="get_parallel_chunksize")
 
     set_chunksize = cgutils.get_or_insert_function(
         builder.module,
-        llvmlite.ir.FunctionType(llvmlite.ir.VoidType(), [uintp_t]),
+        llvmlite.ir.FunctionType(uintp_t, [uintp_t]),
         name="set_parallel_chunksize")
 
-    get_num_threads = cgutils.get_or_insert_function(
-        builder.module,
-        llvmlite.ir.FunctionType(llvmlite.ir.IntType(types.intp.bitwidth), []),
-        "get_num_threads")
+    get_num_threads = _declare_get_num_threads(builder.module)
 
     # Get the current number of threads.
     num_threads = builder.call(get_num_threads, [])
@@ -4,8 +4,10 @@ There was a deadlock problem when work count is smaller than number of threads.
 
 import numpy as np
 
-from numba import float32, float64, int32, uint32
+from numba import float32, float64, int32, uint32, config, guvectorize
 from numba.np.ufunc import Vectorize
+from numba.np.ufunc.parallel import get_thread_id
+from numba.tests.support import override_config
 import unittest
 
 
@@ -17,12 +19,17 @@ class TestParallelLowWorkCount(unittest.TestCase):
 
     _numba_parallel_test_ = False
 
-    def test_low_workcount(self):
+    def build_para_ufunc(self):
         # build parallel native code ufunc
         pv = Vectorize(vector_add, target='parallel')
         for ty in (int32, uint32, float32, float64):
             pv.add(ty(ty, ty))
-        para_ufunc = pv.build_ufunc()
+        return pv.build_ufunc()
+
+    def test_low_workcount(self):
+        # make sure the work is handed to the threading layer however small
+        with override_config('PARALLEL_UFUNC_SERIAL_THRESHOLD', 0):
+            para_ufunc = self.build_para_ufunc()
 
         # build python ufunc
         np_ufunc = np.vectorize(vector_add)
@@ -39,6 +46,37 @@ class TestParallelLowWorkCount(unittest.TestCase):
         test(np.int32)
         test(np.uint32)
 
+    def test_serial_threshold(self):
+        # work below the threshold runs in the calling thread, work at or
+        # above it goes to the threading layer, both must give the same result
+        threshold = 100
+        with override_config('PARALLEL_UFUNC_SERIAL_THRESHOLD', threshold):
+            para_ufunc = self.build_para_ufunc()
+
+        for n in (0, 1, threshold - 1, threshold, 10 * threshold):
+            data = np.arange(n, dtype=np.float64)
+            np.testing.assert_allclose(para_ufunc(data, data), data + data)
+            # non-contiguous input
+            data = np.arange(2 * n, dtype=np.float64)[::2]
+            np.testing.assert_allclose(para_ufunc(data, data), data + data)
+
+    @unittest.skipIf(config.NUMBA_NUM_THREADS < 2, "Not enough CPU cores")
+    def test_serial_threshold_thread_ids(self):
+        # work below the threshold runs entirely in the calling thread, work
+        # above it is spread over the threading layer
+        with override_config('PARALLEL_UFUNC_SERIAL_THRESHOLD', 100):
+            @guvectorize(['void(int64[:], int64[:])'], '(n)->(n)',
+                         nopython=True, target='parallel')
+            def thread_ids(x, out):
+                out[:] = get_thread_id()
+
+        small = np.zeros((2, 10), dtype=np.int64)
+        self.assertEqual(len(np.unique(thread_ids(small))), 1)
+
+        # Reshape to force parallelism
+        big = np.zeros((5000000,), dtype=np.int64).reshape((100, 50000))
+        self.assertGreater(len(np.unique(thread_ids(big))), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
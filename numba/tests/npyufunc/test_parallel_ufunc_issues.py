@@ -1,10 +1,12 @@
 import time
 import ctypes
+import threading
 
 import numpy as np
 
-from numba.tests.support import captured_stdout
+from numba.tests.support import captured_stdout, override_config
 from numba import vectorize, guvectorize
+from numba.np.ufunc import parallel
 import unittest
 
 
@@ -45,12 +47,14 @@ class TestParUfuncIssues(unittest.TestCase):
 
         cbar = proto(bar)
 
-        # our unit under test
-        @vectorize(['int32(int32)'], target='parallel', nopython=True)
-        def foo(x):
-            print(x % 10)  # this reacquires the GIL
-            cbar(x % 10)   # this reacquires the GIL
-            return x * 2
+        # our unit under test, small calls must still go to the threading
+        # layer for this to be tested
+        with override_config('PARALLEL_UFUNC_SERIAL_THRESHOLD', 0):
+            @vectorize(['int32(int32)'], target='parallel', nopython=True)
+            def foo(x):
+                print(x % 10)  # this reacquires the GIL
+                cbar(x % 10)   # this reacquires the GIL
+                return x * 2
 
         # Numpy ufunc has a heuristic to determine whether to release the GIL
         # during execution.  Small input size (10) seems to not release the GIL.
@@ -74,6 +78,34 @@ class TestParUfuncIssues(unittest.TestCase):
             self.assertEqual(got_output, expected_output)
             np.testing.assert_equal(got, 2 * acopy)
 
+    def test_gil_held_by_other_thread(self):
+        """
+        The kernel must only release the GIL if the calling thread holds it,
+        not when another thread does.
+        """
+        @vectorize(['float64(float64)'], target='parallel', nopython=True)
+        def foo(x):
+            return x * 2
+
+        # large enough that NumPy releases the GIL around the loop
+        a = np.arange(10 ** 6, dtype=np.float64)
+        results = []
+
+        def run():
+            for _ in range(20):
+                results.append(foo(a))
+
+        t = threading.Thread(target=run)
+        t.start()
+        # keep this thread in Python code, so holding the GIL whenever the
+        # other thread doesn't
+        while t.is_alive():
+            sum(range(100))
+        t.join()
+
+        self.assertEqual(len(results), 20)
+        for got in results:
+            np.testing.assert_equal(got, 2 * a)
 
 
 class TestParGUfuncIssues(unittest.TestCase):
@@ -93,13 +125,15 @@ class TestParGUfuncIssues(unittest.TestCase):
 
         cbar = proto(bar)
 
-        # our unit under test
-        @guvectorize(['(int32, int32[:])'], "()->()",
-                     target='parallel', nopython=True)
-        def foo(x, out):
-            print(x % 10)  # this reacquires the GIL
-            cbar(x % 10)   # this reacquires the GIL
-            out[0] = x * 2
+        # our unit under test, small calls must still go to the threading
+        # layer for this to be tested
+        with override_config('PARALLEL_UFUNC_SERIAL_THRESHOLD', 0):
+            @guvectorize(['(int32, int32[:])'], "()->()",
+                         target='parallel', nopython=True)
+            def foo(x, out):
+                print(x % 10)  # this reacquires the GIL
+                cbar(x % 10)   # this reacquires the GIL
+                out[0] = x * 2
 
         # Numpy ufunc has a heuristic to determine whether to release the GIL
         # during execution.  Small input size (10) seems to not release the GIL.
@@ -123,6 +157,31 @@ class TestParGUfuncIssues(unittest.TestCase):
             self.assertEqual(got_output, expected_output)
             np.testing.assert_equal(got, 2 * acopy)
 
+    def test_wrapper_reuse(self):
+        # gufuncs with the same layout share the generated kernel wrapper,
+        # each must still dispatch to its own inner function
+        sigs = ['(float64[:], float64[:])', '(int64[:], int64[:])']
+
+        @guvectorize(sigs, "(n)->(n)", target='parallel', nopython=True)
+        def plus_one(x, out):
+            for i in range(x.shape[0]):
+                out[i] = x[i] + 1
+
+        cached = len(parallel._wrapper_ir_cache)
+
+        @guvectorize(sigs, "(n)->(n)", target='parallel', nopython=True)
+        def times_two(x, out):
+            for i in range(x.shape[0]):
+                out[i] = x[i] * 2
+
+        # the second gufunc was built without generating any new wrapper IR
+        self.assertEqual(len(parallel._wrapper_ir_cache), cached)
+
+        for dtype in (np.float64, np.int64):
+            a = np.arange(3 * 5000, dtype=dtype).reshape(3, 5000)
+            np.testing.assert_equal(plus_one(a), a + 1)
+            np.testing.assert_equal(times_two(a), a * 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -88,6 +88,11 @@ class TestNumThreads(TestCase):
         self.assertEqual(set_get_n(2), 2)
         self.assertEqual(set_get_n(max_threads), max_threads)
 
+        for n in (0, -1, max_threads + 1, np.uint64(2 ** 63)):
+            with self.assertRaises(ValueError):
+                set_get_n(n)
+        self.assertEqual(get_num_threads(), max_threads)
+
     @skip_parfors_unsupported
     @unittest.skipIf(config.NUMBA_NUM_THREADS < 2, "Not enough CPU cores")
     def _test_set_num_threads_basic_guvectorize(self):
@@ -14,6 +14,7 @@ import sys
 import textwrap
 import threading
 import unittest
+from unittest import mock
 
 import numpy as np
 
@@ -131,11 +132,16 @@ class linalg_runner(runnable):
         np.testing.assert_allclose(expected, got)
 
 
+# Big enough that parallel target ufuncs are not run serially in the calling
+# thread, see NUMBA_PARALLEL_UFUNC_SERIAL_THRESHOLD
+_UFUNC_SIZE = 2 * config.PARALLEL_UFUNC_SERIAL_THRESHOLD + 10
+
+
 class vectorize_runner(runnable):
 
     def __call__(self):
         cfunc = vectorize(['(f4, f4)'], **self._options)(ufunc_foo)
-        a = b = np.random.random(10).astype(np.float32)
+        a = b = np.random.random(_UFUNC_SIZE).astype(np.float32)
         expected = ufunc_foo(a, b)
         got = cfunc(a, b)
         np.testing.assert_allclose(expected, got)
@@ -146,7 +152,7 @@ class guvectorize_runner(runnable):
     def __call__(self):
         sig = ['(f4, f4, f4[:])']
         cfunc = guvectorize(sig, '(),()->()', **self._options)(gufunc_foo)
-        a = b = np.random.random(10).astype(np.float32)
+        a = b = np.random.random(_UFUNC_SIZE).astype(np.float32)
         expected = ufunc_foo(a, b)
         got = cfunc(a, b)
         np.testing.assert_allclose(expected, got)
@@ -696,6 +702,47 @@ class TestMiscBackendIssues(ThreadLayerTestHelper):
                         "Concurrent access has been detected.")
             self.assertIn(expected, e_msg)
 
+    def test_ufunc_gil_handling_after_subinterpreter(self):
+        """
+        Tests that the parallel ufunc/gufunc kernels don't try to release a
+        GIL they don't hold once a sub-interpreter has been created, CPython
+        disables PyGILState_Check from then on.
+        """
+        runme = """if 1:
+            import importlib
+            import numpy as np
+            from numba import vectorize, guvectorize
+
+            for name in ('_xxsubinterpreters', '_interpreters'):
+                try:
+                    interpreters = importlib.import_module(name)
+                    break
+                except ImportError:
+                    pass
+            else:
+                print("SKIP")
+                raise SystemExit(0)
+            interpreters.destroy(interpreters.create())
+
+            @vectorize(['float64(float64)'], target='parallel')
+            def plus_one(x):
+                return x + 1
+
+            @guvectorize(['(float64[:], float64[:])'], '()->()',
+                         target='parallel')
+            def times_two(x, out):
+                out[0] = x[0] * 2
+
+            # large enough that NumPy releases the GIL around the loop
+            x = np.arange(10 ** 6, dtype=np.float64)
+            np.testing.assert_equal(plus_one(x), x + 1)
+            np.testing.assert_equal(times_two(x), x * 2)
+        """
+        cmdline = [sys.executable, '-c', runme]
+        out, err = self.run_cmd(cmdline, env=os.environ.copy())
+        if "SKIP" in out:
+            self.skipTest("Sub-interpreters are not available")
+
     @unittest.skipUnless(_HAVE_OS_FORK, "Test needs fork(2)")
     def test_workqueue_handles_fork_from_non_main_thread(self):
         # For context see #7872, but essentially the multiprocessing pool
@@ -1228,6 +1275,25 @@ class TestInitSafetyIssues(TestCase):
                 print("ERR:", err)
             self.assertIn(meth, out)
 
+    def test_initialized_launch_threads_is_lock_free(self):
+        # once the threading layer is initialised, _launch_threads() should
+        # return without touching either of the initialisation locks
+        from numba.np.ufunc import parallel
+        parallel._launch_threads()
+
+        class raising_lock(object):
+            def __enter__(self):
+                raise AssertionError("initialisation lock acquired")
+
+            def __exit__(self, *args):
+                pass
+
+        with mock.patch.object(parallel, '_backend_init_process_lock',
+                               raising_lock()), \
+                mock.patch.object(parallel, '_backend_init_thread_lock',
+                                  raising_lock()):
+            parallel._launch_threads()
+
 
 @skip_parfors_unsupported
 @skip_no_omp
@@ -1,4 +1,5 @@
 import ctypes
+import threading
 import unittest
 from numba.core import types
 from numba.core.extending import intrinsic
@@ -119,5 +120,51 @@ class PythonAPIEmptyArgs(unittest.TestCase):
         self.assertEqual(out.getvalue(), expected)
 
 
+@intrinsic
+def _pyapi_gil_check(tyctx):
+    def codegen(context, builder, sig, args):
+        pyapi = context.get_python_api(builder)
+        return pyapi.gil_check()
+
+    return types.boolean(), codegen
+
+
+class PythonAPIGILCheck(unittest.TestCase):
+    def test_gil_check(self):
+        def foo():
+            return _pyapi_gil_check()
+
+        self.assertTrue(njit(foo)())
+        self.assertFalse(njit(nogil=True)(foo)())
+
+    def test_gil_check_other_thread(self):
+        # The GIL being held by another thread must not be reported as held
+        # by this one.
+        @njit(nogil=True)
+        def foo(n):
+            held = False
+            for _ in range(n):
+                held |= _pyapi_gil_check()
+            return held
+
+        stop = threading.Event()
+
+        def spin():
+            # keeps this thread in Python code, so holding the GIL whenever
+            # it can
+            while not stop.is_set():
+                pass
+
+        foo(1)  # compile before starting the spinning thread
+        t = threading.Thread(target=spin)
+        t.start()
+        try:
+            for _ in range(10):
+                self.assertFalse(foo(100000))
+        finally:
+            stop.set()
+            t.join()
+
+
 if __name__ == '__main__':
     unittest.main()